@@ -0,0 +1,468 @@
+"""
+AozoraReaderのベンチマーク
+
+テキストの抽出・分割、話者一覧の取得、ReaderWorkerによる読み上げを計測し、結果をJSONで出力する。
+SeikaSay2の代わりにfake_seikasay2.pyを使うため、AssistantSeikaがなくても実行できる。
+
+    python benchmarks/bench.py --output before.json
+    python benchmarks/bench.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from array import array
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import main
+from make_fixtures import SIZES, WORDS, ensure_fixtures
+from PySide6.QtCore import QCoreApplication
+
+FAKE_SEIKASAY2 = os.path.join(BENCH_DIR, 'fake_seikasay2.py')
+
+
+class FakeSeikaSayBackend(main.SeikaSayBackend):
+    """
+    fake_seikasay2.pyを現在のPythonで起動するバックエンド
+    """
+    def command(self):
+        return [sys.executable, FAKE_SEIKASAY2]
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class ThrottledHandler(QuietHandler):
+    """
+    一定の速さでしか送らないハンドラー（遅い回線での取得をまねる）
+    """
+    rate = 1e6  # バイト/秒
+
+    def copyfile(self, source, outputfile):
+        while True:
+            block = source.read(16 * 1024)
+            if not block:
+                break
+            outputfile.write(block)
+            time.sleep(len(block) / self.rate)
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def measure(func, repeat, setup=None):
+    """
+    funcをrepeat回実行し、それぞれの所要時間（秒）を返す（setupの時間は含めない）
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(name, params, times, amount=None, unit=None, info=None):
+    """
+    計測結果を1件の辞書にまとめる（amountを指定すると中央値から処理量/秒を求める）
+
+    比較にはnameとparamsを使うため、入力から決まる値（バイト数など）はinfoに入れる。
+    """
+    median = statistics.median(times)
+    result = {
+        "name": name,
+        "params": params,
+        "info": info or {},
+        "repeat": len(times),
+        "min": min(times),
+        "median": median,
+        "mean": statistics.mean(times),
+        "max": max(times),
+    }
+    if amount is not None and median > 0:
+        result["throughput"] = amount / median
+        result["unit"] = unit
+    log(f"{name} {json.dumps(params, ensure_ascii=False)}: 中央値 {median * 1000:.2f}ms"
+        + (f" ({result['throughput']:.1f} {unit})" if "throughput" in result else ""))
+    return result
+
+
+def decode_html(content):
+    """
+    get_aozora_textと同じく、文書の宣言から決めた文字コードでデコードする
+    """
+    return content.decode(main.AozoraTextExtractor.detect_encoding(content[:1024]), errors='replace')
+
+
+def make_talker(cache_dir):
+    talker = main.AozoraSeikaTalker(BENCH_DIR, cache_dir)
+    talker.seika_console = FAKE_SEIKASAY2
+    talker.backend = FakeSeikaSayBackend(talker)
+    return talker
+
+
+def bench_extract(fixtures, repeat, work_dir):
+    results = []
+    for size, (html_path, _) in fixtures.items():
+        with open(html_path, 'rb') as f:
+            content = f.read()
+        talker = make_talker(work_dir)
+        # get_aozora_textの取得後と同じくデコードしてから抽出する
+        times = measure(lambda: talker.extract_aozora_text(decode_html(content)), repeat)
+        results.append(summarize("extract_aozora_text", {"size": size}, times,
+                                 len(content) / 1e6, "MB/s", {"bytes": len(content)}))
+    return results
+
+
+def bench_get_aozora_text(fixtures, repeat, work_dir):
+    """
+    ローカルのHTTPサーバーから取得する（キャッシュなしとキャッシュ済みの両方）
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=os.path.dirname(next(iter(fixtures.values()))[0])))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    results = []
+    try:
+        for size, (html_path, _) in fixtures.items():
+            url = f"http://127.0.0.1:{server.server_address[1]}/{os.path.basename(html_path)}"
+            nbytes = os.path.getsize(html_path)
+            state = {}
+
+            def cold_setup():
+                cache_dir = tempfile.mkdtemp(dir=work_dir)
+                state["talker"] = make_talker(cache_dir)
+
+            times = measure(lambda: state["talker"].get_aozora_text(url), repeat, cold_setup)
+            results.append(summarize("get_aozora_text", {"size": size, "cache": "cold"}, times, nbytes / 1e6, "MB/s"))
+            times = measure(lambda: state["talker"].get_aozora_text(url), repeat)
+            results.append(summarize("get_aozora_text", {"size": size, "cache": "fresh"}, times, nbytes / 1e6, "MB/s"))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def bench_first_chunk(fixtures, repeat, work_dir, rate):
+    """
+    遅い回線で取得を始めてから、最初のチャンクを読み上げられるまでの時間
+    （取得しながら分割する場合と、取得後に分割する場合）
+    """
+    handler = type('Handler', (ThrottledHandler,), {'rate': rate})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(handler, directory=os.path.dirname(next(iter(fixtures.values()))[0])))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    results = []
+    try:
+        for size, (html_path, _) in fixtures.items():
+            url = f"http://127.0.0.1:{server.server_address[1]}/{os.path.basename(html_path)}"
+            for streaming in (False, True):
+                times = []
+                for _ in range(repeat):
+                    talker = make_talker(tempfile.mkdtemp(dir=work_dir))
+                    start = time.perf_counter()
+                    if streaming:
+                        stream = main.AozoraTextStream(talker)
+                        fetcher = threading.Thread(target=talker.get_aozora_text, args=(url, stream))
+                        fetcher.start()
+                        talker.wait_until(lambda: stream.document.chunks or stream.complete)
+                        times.append(time.perf_counter() - start)
+                        fetcher.join()
+                    else:
+                        text, _, _, headings = talker.get_aozora_text(url)
+                        text, headings = talker.normalize_text(text, headings)
+                        next(talker.iter_chunk_spans(text, breaks={heading.offset for heading in headings}))
+                        times.append(time.perf_counter() - start)
+                results.append(summarize("first_chunk", {"size": size, "streaming": streaming, "rate": rate}, times,
+                                         info={"bytes": os.path.getsize(html_path)}))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def bench_read_text_file(fixtures, repeat, work_dir):
+    results = []
+    talker = make_talker(work_dir)
+    for size, (_, text_path) in fixtures.items():
+        nbytes = os.path.getsize(text_path)
+        times = measure(lambda: talker.read_text_file(text_path), repeat)
+        results.append(summarize("read_text_file", {"size": size}, times, nbytes / 1e6, "MB/s", {"bytes": nbytes}))
+    return results
+
+
+def bench_split(fixtures, repeat, work_dir, chunk_sizes=(200,)):
+    results = []
+    talker = make_talker(work_dir)
+    for size, (html_path, _) in fixtures.items():
+        with open(html_path, 'rb') as f:
+            text = talker.extract_aozora_text(decode_html(f.read()))[0]
+        for chunk_size in chunk_sizes:
+            chunk_count = len(talker.split_text_into_chunks(text, chunk_size))
+            times = measure(lambda: talker.split_text_into_chunks(text, chunk_size), repeat)
+            results.append(summarize("split_text_into_chunks", {"size": size, "chunk_size": chunk_size},
+                                     times, len(text) / 1e6, "Mchar/s", {"chars": len(text), "chunks": chunk_count}))
+    return results
+
+
+def bench_document(fixtures, repeat, work_dir, chunk_size=200):
+    """
+    作品をDocumentとして読み込んで分割する時間と、読み込んだ作品が保持するメモリ
+    """
+    results = []
+    talker = make_talker(work_dir)
+    for size, (html_path, _) in fixtures.items():
+        with open(html_path, 'rb') as f:
+            text, title, author, headings = talker.extract_aozora_text(decode_html(f.read()))
+        times = measure(lambda: talker.chunk_document(main.Document(text, title, author, headings), chunk_size), repeat)
+        # 本文以外に保持する分（チャンク・見出しの位置とビュー）
+        tracemalloc.start()
+        _, document = talker.chunk_document(main.Document(text, title, author, headings), chunk_size)
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results.append(summarize("chunk_document", {"size": size, "chunk_size": chunk_size}, times,
+                                 info={"chars": len(text), "chunks": len(document.chunks), "bytes_held": held}))
+    return results
+
+
+def make_document(chunks):
+    """
+    チャンクの文字列を段落区切りでつないだDocumentを作る
+    """
+    spans = array('q')
+    start = 0
+    for chunk in chunks:
+        spans.extend((start, start + len(chunk), -1))
+        start += len(chunk) + len(main.AozoraSeikaTalker.PARAGRAPH_SEPARATOR)
+    document = main.Document(main.AozoraSeikaTalker.PARAGRAPH_SEPARATOR.join(chunks))
+    return document.with_chunks(max(map(len, chunks)), spans)
+
+
+def bench_normalize(fixtures, repeat, work_dir, dictionary_sizes=(100, 10000)):
+    """
+    読み辞書による置き換え（辞書には本文に頻出する語と、本文にない語を入れる）
+    """
+    results = []
+    talker = make_talker(work_dir)
+    r = random.Random(0)
+    for dictionary_size in dictionary_sizes:
+        words = set(WORDS)
+        while len(words) < dictionary_size:
+            words.add(''.join(r.choice('あいうえおかきくけこ山川谷') for _ in range(r.randint(2, 5))))
+        talker.normalizer = main.TextNormalizer({word: word + 'よみ' for word in words})
+        start = time.perf_counter()
+        talker.normalizer.compile()
+        compile_time = time.perf_counter() - start
+        for size, (html_path, _) in fixtures.items():
+            with open(html_path, 'rb') as f:
+                text = talker.extract_aozora_text(decode_html(f.read()))[0]
+            times = measure(lambda: talker.normalize_text(text), repeat)
+            results.append(summarize("normalize_text", {"size": size, "words": dictionary_size}, times,
+                                     len(text) / 1e6, "Mchar/s", {"chars": len(text), "compile": compile_time}))
+    return results
+
+
+def bench_voice_list(repeat, work_dir):
+    """
+    話者一覧の取得（SeikaSay2を起動する場合と保存済みの一覧を使う場合）
+    """
+    talker = make_talker(tempfile.mkdtemp(dir=work_dir))
+    results = []
+    times = measure(lambda: talker.get_voice_list(refresh=True), repeat)
+    results.append(summarize("get_voice_list", {"registry": "refresh"}, times))
+    times = measure(lambda: talker.get_voice_list(), repeat)
+    results.append(summarize("get_voice_list", {"registry": "cached"}, times))
+    voice_name = talker.get_voice_list()[0]
+    talker.voice_registry.params = {}
+    times = measure(lambda: talker.get_voice_params(voice_name), 1)
+    results.append(summarize("get_voice_params", {"registry": "refresh"}, times))
+    return results
+
+
+def bench_reader(repeat, work_dir, chunks, chunk_chars, lookaheads=(0, 2)):
+    """
+    ReaderWorkerで読み上げを最後まで実行し、1秒あたりのチャンク数を求める
+    """
+    results = []
+    document = make_document([f"{i}番目のチャンク。" + "あ" * chunk_chars for i in range(chunks)])
+    for lookahead in lookaheads:
+        state = {}
+
+        def setup():
+            talker = make_talker(tempfile.mkdtemp(dir=work_dir))
+            talker.set_interval(0)
+            talker.set_lookahead(lookahead)
+            talker.set_use_audio_cache(False)
+            state["talker"] = talker
+            state["voice"] = talker.get_voice_list()[0]
+
+        def run():
+            worker = main.ReaderWorker(state["talker"], document, state["voice"])
+            state["talker"].begin_reading()
+            worker.start()
+            worker.wait()
+
+        times = measure(run, repeat, setup)
+        results.append(summarize("reader_worker", {"lookahead": lookahead, "chunks": chunks, "chunk_chars": chunk_chars},
+                                 times, chunks, "chunk/s"))
+    return results
+
+
+def bench_first_audio(repeat, work_dir, chunk_chars=200):
+    """
+    読み上げを始めてから最初の再生が始まるまでの時間（適応分割の有無と先読みの有無）
+    """
+    results = []
+    sentence = "私はその人を常に先生と呼んでいた。"
+    chunk = (sentence * (chunk_chars // len(sentence) + 1))[:chunk_chars]
+    document = make_document([chunk] * 3)
+    for adaptive in (False, True):
+        for lookahead in (0, 2):
+            state = {}
+
+            def setup():
+                talker = make_talker(tempfile.mkdtemp(dir=work_dir))
+                talker.set_interval(0)
+                talker.set_lookahead(lookahead)
+                talker.set_adaptive_chunking(adaptive)
+                state["talker"] = talker
+                state["voice"] = talker.get_voice_list()[0]
+                play_wav = talker.play_wav
+
+                # 最初に再生を始めた時刻を記録したら、読み上げを止める
+                def first_play(wav_path):
+                    state.setdefault("first", time.perf_counter())
+                    talker.stop()
+                    return play_wav(wav_path)
+                talker.play_wav = first_play
+
+            def run():
+                state.pop("first", None)
+                state["start"] = time.perf_counter()
+                worker = main.ReaderWorker(state["talker"], document, state["voice"])
+                state["talker"].begin_reading()
+                worker.start()
+                worker.wait()
+
+            times = []
+            for _ in range(repeat):
+                setup()
+                run()
+                times.append(state["first"] - state["start"])
+            results.append(summarize("first_audio", {"adaptive": adaptive, "lookahead": lookahead, "chunk_chars": chunk_chars},
+                                     times))
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """
+    以前の結果と中央値を比べて表示する
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["name"], json.dumps(r["params"], sort_keys=True)): r for r in json.load(f)["results"]}
+    log(f"\n{baseline_path} との比較（中央値、1未満なら速くなった）")
+    for result in results:
+        old = baseline.get((result["name"], json.dumps(result["params"], sort_keys=True)))
+        if old and old["median"] > 0:
+            log(f"  {result['name']} {json.dumps(result['params'], ensure_ascii=False)}: "
+                f"{old['median'] * 1000:.2f}ms -> {result['median'] * 1000:.2f}ms (x{result['median'] / old['median']:.3f})")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="AozoraReaderのベンチマーク")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium", "large"],
+                        help="使うファイルのサイズ（hugeは時間がかかる）")
+    parser.add_argument("--repeat", type=int, default=5, help="各計測の繰り返し回数")
+    parser.add_argument("--latency", type=float, default=0.05, help="偽のSeikaSay2の1回あたりの待ち時間（秒）")
+    parser.add_argument("--char-time", type=float, default=0.001, help="偽のSeikaSay2の1文字あたりの音声の長さ（秒）")
+    parser.add_argument("--synth-time", type=float, default=0.0, help="偽のSeikaSay2の1文字あたりの合成時間（秒）")
+    parser.add_argument("--reader-chunks", type=int, default=20, help="読み上げの計測で使うチャンク数")
+    parser.add_argument("--rate", type=float, default=1e6, help="取得しながら読む計測での回線の速さ（バイト/秒）")
+    parser.add_argument("--only", nargs="+",
+                        choices=["extract", "fetch", "stream", "text", "normalize", "split", "document", "voices", "reader",
+                                 "first_audio"],
+                        help="実行する計測（省略時はすべて）")
+    parser.add_argument("-o", "--output", help="結果のJSONの保存先（省略時は標準出力）")
+    parser.add_argument("--compare", help="比較する以前の結果のJSON")
+    args = parser.parse_args()
+
+    os.environ["FAKE_SEIKA_LATENCY"] = str(args.latency)
+    os.environ["FAKE_SEIKA_CHAR_TIME"] = str(args.char_time)
+    os.environ["FAKE_SEIKA_SYNTH_TIME"] = str(args.synth_time)
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    fixtures = ensure_fixtures(args.sizes)
+    only = set(args.only) if args.only else None
+    work_dir = tempfile.mkdtemp(prefix="aozora_bench_")
+    results = []
+    try:
+        if only is None or "extract" in only:
+            results += bench_extract(fixtures, args.repeat, work_dir)
+        if only is None or "fetch" in only:
+            results += bench_get_aozora_text(fixtures, args.repeat, work_dir)
+        if only is None or "stream" in only:
+            results += bench_first_chunk(fixtures, args.repeat, work_dir, args.rate)
+        if only is None or "text" in only:
+            results += bench_read_text_file(fixtures, args.repeat, work_dir)
+        if only is None or "normalize" in only:
+            results += bench_normalize(fixtures, args.repeat, work_dir)
+        if only is None or "split" in only:
+            results += bench_split(fixtures, args.repeat, work_dir)
+        if only is None or "document" in only:
+            results += bench_document(fixtures, args.repeat, work_dir)
+        if only is None or "voices" in only:
+            results += bench_voice_list(args.repeat, work_dir)
+        if only is None or "reader" in only:
+            results += bench_reader(args.repeat, work_dir, args.reader_chunks, 50)
+        if only is None or "first_audio" in only:
+            results += bench_first_audio(args.repeat, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    content = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(content)
+    else:
+        print(content)
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_bench())
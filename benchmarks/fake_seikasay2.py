@@ -0,0 +1,53 @@
+"""
+ベンチマーク用のSeikaSay2の代わり（音声は合成せず、待ち時間と無音のWAVで振る舞いをまねる）
+
+-list, -params, -save, -t に対応する。待ち時間は環境変数で指定する。
+
+    FAKE_SEIKA_LATENCY    1回の呼び出しごとの待ち時間（秒、既定 0.05）
+    FAKE_SEIKA_SYNTH_TIME 1文字あたりの合成時間（秒、既定 0）
+    FAKE_SEIKA_CHAR_TIME  1文字あたりの音声の長さ（秒、既定 0.01）
+                          -saveでは無音のWAVの長さ、再生ではその分だけ待機する
+    FAKE_SEIKA_VOICES     話者の数（既定 4）
+"""
+
+import os
+import sys
+import time
+import wave
+
+VOICE_NAMES = ['結月ゆかり', '琴葉茜', '琴葉葵', '東北きりたん', '京町セイカ', '紲星あかり']
+SAMPLE_RATE = 22050
+
+
+def main(argv):
+    latency = float(os.environ.get('FAKE_SEIKA_LATENCY', '0.05'))
+    char_time = float(os.environ.get('FAKE_SEIKA_CHAR_TIME', '0.01'))
+    synth_time = float(os.environ.get('FAKE_SEIKA_SYNTH_TIME', '0'))
+    voices = int(os.environ.get('FAKE_SEIKA_VOICES', '4'))
+
+    if '-list' in argv:
+        for i in range(voices):
+            print(f"  {1700 + i} {VOICE_NAMES[i % len(VOICE_NAMES)]}{i // len(VOICE_NAMES) or ''} - VOICEROID2")
+        return 0
+    if '-params' in argv:
+        print("effect : volume = 1.00 [0.00～2.00, step 0.01]")
+        print("effect : speed = 1.00 [0.50～4.00, step 0.01]")
+        print("effect : pitch = 1.00 [0.50～2.00, step 0.01]")
+        print("emotion : 喜び = 0.00 [0.00～1.00, step 0.01]")
+        return 0
+
+    text = argv[argv.index('-t') + 1] if '-t' in argv else ''
+    time.sleep(latency + synth_time * len(text))
+    if '-save' in argv:
+        with wave.open(argv[argv.index('-save') + 1], 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SAMPLE_RATE)
+            w.writeframes(b'\0\0' * int(SAMPLE_RATE * char_time * len(text)))
+    else:
+        time.sleep(char_time * len(text))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,183 @@
+"""
+ベンチマーク用の青空文庫形式のファイル（XHTMLとルビ付きテキスト）を生成する
+
+同じシードからは常に同じ内容を生成するため、計測ごとに入力が変わらない。
+smallはリポジトリに含めてあり、それ以外は実行時に生成する。
+
+    python benchmarks/make_fixtures.py [--sizes small medium large huge]
+"""
+
+import argparse
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 段落数（XHTMLはおおよそ small 40KB / medium 800KB / large 4MB / huge 16MB）
+SIZES = {
+    'small': 200,
+    'medium': 4000,
+    'large': 20000,
+    'huge': 80000,
+}
+
+WORDS = ['先生', '私', 'その人', '鎌倉', '海水浴', '友達', '東京', '峠', '旅人', '刀']
+PARTICLES = ['は', 'が', 'を']
+ENDINGS = ['。', '、', '！', '？', '']
+
+HTML_HEAD = '''<?xml version="1.0" encoding="Shift_JIS"?>
+<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.1//EN"
+    "http://www.w3.org/TR/xhtml11/DTD/xhtml11.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="ja" >
+<head>
+\t<meta http-equiv="Content-Type" content="text/html;charset=Shift_JIS" />
+\t<title>ベンチマーク太郎 ベンチマーク用作品</title>
+\t<script type="text/javascript" src="../../jquery-1.4.2.min.js"></script>
+</head>
+<body>
+<div class="metadata">
+<h1 class="title">ベンチマーク用作品</h1>
+<h2 class="author">ベンチマーク太郎</h2>
+<br />
+<br />
+</div>
+<div id="contents" style="display:none"></div><div class="main_text"><br />
+'''
+
+HTML_TAIL = '''</div>
+<div class="bibliographical_information">
+<hr />
+<br />
+底本：「ベンチマーク用作品」ベンチマーク文庫<br />
+</div>
+</body>
+</html>
+'''
+
+TEXT_HEAD = '''ベンチマーク用作品
+ベンチマーク太郎
+
+-------------------------------------------------------
+【テキスト中に現れる記号について】
+
+《》：ルビ
+（例）私《わたくし》
+
+｜：ルビの付く文字列の始まりを特定する記号
+（例）一｜箇月《かげつ》
+
+［＃］：入力者注　主に外字の説明や、傍点の位置の指定
+-------------------------------------------------------
+'''
+
+TEXT_TAIL = '''
+
+
+底本：「ベンチマーク用作品」ベンチマーク文庫
+入力：ベンチマーク
+'''
+
+
+def make_html_paragraph(r):
+    out = []
+    for _ in range(r.randint(1, 12)):
+        k = r.random()
+        word = r.choice(WORDS)
+        if k < 0.15:
+            out.append(f'<ruby><rb>{word}</rb><rp>（</rp><rt>よみ</rt><rp>）</rp></ruby>')
+        elif k < 0.2:
+            out.append('<img src="../../../gaiji/1-84/1-84-77.png" alt="※(「てへん＋劣」、第3水準1-84-77)" class="gaiji" />')
+        elif k < 0.25:
+            out.append(f'<em class="sesame_dot">{word}</em>')
+        elif k < 0.28:
+            out.append('<span class="notes">［＃「峠」に傍点］</span>')
+        elif k < 0.3:
+            out.append('&amp;&lt;&#x3042;&#12354;')
+        else:
+            out.append(word + r.choice(PARTICLES) + '行った' + r.choice(ENDINGS))
+    return '　' + ''.join(out) + '<br />\r\n'
+
+
+def make_text_paragraph(r):
+    out = []
+    for _ in range(r.randint(1, 12)):
+        k = r.random()
+        word = r.choice(WORDS)
+        if k < 0.15:
+            out.append(f'{word}《よみ》')
+        elif k < 0.2:
+            out.append(f'一｜{word}《よみ》')
+        elif k < 0.25:
+            out.append('※［＃「てへん＋劣」、第3水準1-84-77］')
+        elif k < 0.28:
+            out.append(f'{word}［＃「{word}」に傍点］')
+        else:
+            out.append(word + r.choice(PARTICLES) + '行った' + r.choice(ENDINGS))
+    return '　' + ''.join(out) + '\r\n'
+
+
+def make_html(paragraphs, seed=0):
+    r = random.Random(seed)
+    body = []
+    for i in range(paragraphs):
+        if i % 200 == 0:
+            body.append(f'<h3 class="o-midashi"><a class="midashi_anchor" id="midashi{i}0">第{i // 200 + 1}章</a></h3>\r\n<br />\r\n')
+        if i % 40 == 0:
+            body.append(f'<h4 class="naka-midashi"><a class="midashi_anchor" id="midashi{i}1">{i // 40 + 1}</a></h4>\r\n<br />\r\n')
+        body.append(make_html_paragraph(r))
+        if r.random() < 0.1:
+            body.append('<br />\r\n')
+    return HTML_HEAD + ''.join(body) + HTML_TAIL
+
+
+def make_text(paragraphs, seed=0):
+    r = random.Random(seed)
+    body = []
+    for i in range(paragraphs):
+        if i % 200 == 0:
+            body.append(f'\r\n［＃８字下げ］第{i // 200 + 1}章［＃「第{i // 200 + 1}章」は大見出し］\r\n\r\n')
+        if i % 40 == 0:
+            body.append(f'［＃５字下げ］{i // 40 + 1}［＃「{i // 40 + 1}」は中見出し］\r\n\r\n')
+        body.append(make_text_paragraph(r))
+        if r.random() < 0.1:
+            body.append('\r\n')
+    return TEXT_HEAD.replace('\n', '\r\n') + ''.join(body) + TEXT_TAIL.replace('\n', '\r\n')
+
+
+def fixture_paths(size):
+    return os.path.join(FIXTURE_DIR, f'{size}.html'), os.path.join(FIXTURE_DIR, f'{size}.txt')
+
+
+def ensure_fixtures(sizes, force=False):
+    """
+    指定されたサイズのファイルがなければ生成する
+
+    Returns:
+    --------
+    dict : サイズ名 -> (XHTMLのパス, テキストのパス)
+    """
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    paths = {}
+    for size in sizes:
+        html_path, text_path = fixture_paths(size)
+        if force or not os.path.exists(html_path):
+            with open(html_path, 'wb') as f:
+                f.write(make_html(SIZES[size]).encode('cp932'))
+        if force or not os.path.exists(text_path):
+            with open(text_path, 'wb') as f:
+                f.write(make_text(SIZES[size]).encode('cp932'))
+        paths[size] = (html_path, text_path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマーク用のファイルを生成する")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES), help="生成するサイズ")
+    parser.add_argument("--force", action="store_true", help="既存のファイルも生成し直す")
+    args = parser.parse_args()
+    for size, paths in ensure_fixtures(args.sizes, args.force).items():
+        print(size, *[f"{path} ({os.path.getsize(path) // 1024}KB)" for path in paths])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import functools
+import os
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+BENCH_DIR = os.path.join(ROOT_DIR, 'benchmarks')
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import main
+
+FAKE_SEIKASAY2 = os.path.join(BENCH_DIR, 'fake_seikasay2.py')
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+
+
+class FakeSeikaSayBackend(main.SeikaSayBackend):
+    """
+    fake_seikasay2.pyを現在のPythonで起動するバックエンド
+    """
+    def command(self):
+        return [sys.executable, FAKE_SEIKASAY2]
+
+
+@pytest.fixture
+def talker(tmp_path, monkeypatch):
+    """
+    キャッシュを一時ディレクトリに置き、SeikaSay2の代わりにfake_seikasay2.pyを使うインスタンス
+    """
+    monkeypatch.setenv('FAKE_SEIKA_LATENCY', '0.01')
+    monkeypatch.setenv('FAKE_SEIKA_CHAR_TIME', '0.0005')
+    talker = main.AozoraSeikaTalker(BENCH_DIR, str(tmp_path / 'cache'))
+    talker.seika_console = FAKE_SEIKASAY2
+    talker.backend = FakeSeikaSayBackend(talker)
+    return talker
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    benchmarks/fixturesのファイルを返すサーバー
+
+    failuresに指定したパスには、リストの先頭から順にそのステータスで応答してから本来のファイルを返す。
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        handler = functools.partial(FixtureHandler, directory=FIXTURES_DIR)
+        super().__init__(('127.0.0.1', 0), handler)
+        self.failures = {}  # パス -> 先に返すステータスのリスト
+        self.received = []  # (パス, 受け取った時刻)
+        self.lock = threading.Lock()
+
+    def url(self, name, host='127.0.0.1'):
+        return f"http://{host}:{self.server_address[1]}/{name}"
+
+    def requests_for(self, name):
+        return [received for path, received in self.received if path == '/' + name]
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.received.append((self.path, time.monotonic()))
+            failures = self.server.failures.get(self.path)
+            status = failures.pop(0) if failures else None
+        if status:
+            self.send_error(status)
+            return
+        super().do_GET()
+
+
+@pytest.fixture
+def fixture_server():
+    server = FixtureServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
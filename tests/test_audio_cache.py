@@ -0,0 +1,85 @@
+import os
+import threading
+
+import pytest
+
+import main
+
+
+def test_concurrent_renders_of_same_text(talker):
+    """
+    同じテキストを同時に合成しても、それぞれがキャッシュのWAVファイルを得られる
+    """
+    voice_name = talker.get_voice_list()[0]
+    workers = 8
+    barrier = threading.Barrier(workers)
+    results = [None] * workers
+
+    def render(index):
+        barrier.wait()
+        results[index] = talker.render_text("「はい」と言った。", voice_name)
+
+    threads = [threading.Thread(target=render, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(results), results
+    assert len(set(results)) == 1 and os.path.exists(results[0])
+    leftovers = [name for name in os.listdir(talker.audio_cache.cache_dir) if ".tmp" in name]
+    assert leftovers == []
+
+
+def test_temp_paths_are_unique(tmp_path):
+    cache = main.AudioCache(str(tmp_path))
+    paths = {cache.temp_path_for("key") for _ in range(10)}
+    assert len(paths) == 10
+    assert all(os.path.dirname(path) == str(tmp_path) and path.endswith(".tmp.wav") for path in paths)
+
+
+def test_page_cache_write_is_atomic_per_writer(tmp_path):
+    cache = main.DiskLRUCache(str(tmp_path), 1024 * 1024)
+    path = cache.path_for("page", ".html")
+    threads = [threading.Thread(target=cache.write, args=(path, bytes([i]) * 1000)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(path, "rb") as f:
+        data = f.read()
+    assert len(data) == 1000 and len(set(data)) == 1
+    assert os.listdir(str(tmp_path)) == ["page.html"]
+
+
+def test_page_index_updates_from_several_processes(tmp_path, monkeypatch):
+    # 同じディレクトリを使う2つのインスタンス（画面とサービス）から同時に更新する
+    caches = [main.AozoraPageCache(str(tmp_path)) for _ in range(2)]
+    errors = []
+
+    def update(cache, worker):
+        try:
+            for i in range(50):
+                cache.update(f"https://example.com/{worker}/{i}", {"sha": "0" * 64})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=update, args=(caches[i % 2], i)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(main.AozoraPageCache(str(tmp_path)).index) >= 100
+    assert sorted(os.listdir(str(tmp_path))) == ["objects", "pages.json"]
+
+    # 書き込みに失敗しても一時ファイルを残さず、前の索引を壊さない
+    def failing_dump(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(main.json, "dump", failing_dump)
+    with pytest.raises(OSError):
+        caches[0].update("https://example.com/failed", {"sha": "0" * 64})
+    monkeypatch.undo()
+    assert "https://example.com/failed" not in main.AozoraPageCache(str(tmp_path)).index
+    assert sorted(os.listdir(str(tmp_path))) == ["objects", "pages.json"]
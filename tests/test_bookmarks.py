@@ -0,0 +1,56 @@
+import json
+from array import array
+
+import main
+
+TEXT = "第一章\n\n" + "本文です。" * 40 + "\n\n第二章\n\n" + "続きです。" * 40
+
+
+def chunk(talker, text, source="url:https://example.com/a.html", chunk_size=50):
+    headings = [main.Heading(1, "第一章", 0), main.Heading(1, "第二章", text.find("第二章"))]
+    return talker.chunk_document(main.Document(text, "t", "a", headings), chunk_size, source)
+
+
+def test_saved_spans_are_reused(talker):
+    _, document = chunk(talker, TEXT)
+    talker.bookmarks.save_position("url:https://example.com/a.html", 50, 3)
+    position, reloaded = chunk(talker, TEXT)
+    assert position == 3
+    assert reloaded.spans == document.spans
+
+
+def test_changed_text_of_same_length_is_rechunked(talker):
+    _, document = chunk(talker, TEXT)
+    talker.bookmarks.save_position("url:https://example.com/a.html", 50, 3)
+    # 辞書を変えた場合などで、長さが同じでも本文が変われば分割し直す
+    changed = TEXT.replace("本文です。", "文章です。\n\n", 1)[:len(TEXT)]
+    assert len(changed) == len(TEXT)
+    position, reloaded = chunk(talker, changed)
+    assert position == 0
+    assert list(reloaded.iter_spans()) == list(talker.iter_chunk_spans(changed, 50, breaks=reloaded.heading_offsets))
+    assert talker.bookmarks.load("url:https://example.com/a.html", 50, TEXT) == (0, None)
+
+
+def test_old_format_is_discarded(talker):
+    source = "url:https://example.com/a.html"
+    store = talker.bookmarks
+    # 見出しで区切る前の形式（本文の長さだけを保存し、空のチャンクを含む）
+    with open(store.path_for(source, 50, '.index'), "wb") as f:
+        f.write(array('q', [0, 0, -1, 0, 10, -1]).tobytes())
+    with open(store.path_for(source, 50, '.json'), "w", encoding="utf-8") as f:
+        json.dump({"source": source, "chunk_size": 50, "text_length": len(TEXT), "position": 1}, f)
+    assert store.load(source, 50, TEXT) == (0, None)
+    position, document = chunk(talker, TEXT)
+    assert position == 0 and all(start < end for start, end, _ in document.iter_spans())
+
+
+def test_format_version_mismatch_is_discarded(talker, monkeypatch):
+    chunk(talker, TEXT)
+    assert talker.bookmarks.load("url:https://example.com/a.html", 50, TEXT)[1] is not None
+    monkeypatch.setattr(main.BookmarkStore, "FORMAT_VERSION", main.BookmarkStore.FORMAT_VERSION + 1)
+    assert talker.bookmarks.load("url:https://example.com/a.html", 50, TEXT) == (0, None)
+
+
+def test_position_without_index_is_not_saved(talker):
+    talker.bookmarks.save_position("url:https://example.com/b.html", 50, 5)
+    assert talker.bookmarks.load("url:https://example.com/b.html", 50, TEXT) == (0, None)
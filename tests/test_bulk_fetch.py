@@ -0,0 +1,89 @@
+import pytest
+
+import main
+
+pytest.importorskip('requests')
+
+
+def fetch_all(talker, urls, **kwargs):
+    calls = []
+    kwargs.setdefault('min_interval', 0)
+    kwargs.setdefault('backoff', 0.05)
+    fetcher = main.BulkFetcher(talker, progress=lambda *args: calls.append(args), **kwargs)
+    return fetcher.fetch_all(urls), calls
+
+
+def test_fetch_all_and_progress(talker, fixture_server):
+    urls = [fixture_server.url(f'small.html?{i}') for i in range(5)]
+    results, calls = fetch_all(talker, urls, workers=3)
+    assert [result['url'] for result in results] == urls
+    assert all(result['ok'] and result['attempts'] == 1 for result in results)
+    assert results[0]['title'] and results[0]['author']
+    assert all(talker.is_cached(url) for url in urls)
+    # 1件終わるごとに、完了数と全体数と結果が届く
+    assert sorted(done for done, _, _ in calls) == [1, 2, 3, 4, 5]
+    assert {total for _, total, _ in calls} == {5}
+    assert sorted(result['url'] for _, _, result in calls) == sorted(urls)
+
+
+@pytest.mark.parametrize('status', [503, 500, 429])
+def test_server_errors_are_retried_with_backoff(talker, fixture_server, status):
+    fixture_server.failures['/small.html'] = [status, status]
+    results, _ = fetch_all(talker, [fixture_server.url('small.html')], retries=3)
+    assert results[0]['ok'] and results[0]['attempts'] == 3
+    received = fixture_server.requests_for('small.html')
+    assert len(received) == 3
+    # 再試行のたびに待ち時間が2倍になる
+    assert received[1] - received[0] >= 0.05 and received[2] - received[1] >= 0.1
+
+
+def test_retries_are_limited(talker, fixture_server):
+    fixture_server.failures['/small.html'] = [503] * 5
+    results, calls = fetch_all(talker, [fixture_server.url('small.html')], retries=2)
+    assert not results[0]['ok'] and results[0]['attempts'] == 3
+    assert '503' in results[0]['error']
+    assert len(fixture_server.requests_for('small.html')) == 3
+    assert calls == [(1, 1, results[0])]
+
+
+def test_not_found_is_not_retried(talker, fixture_server):
+    results, calls = fetch_all(talker, [fixture_server.url('missing.html'), fixture_server.url('small.html')])
+    missing, found = results
+    assert not missing['ok'] and missing['attempts'] == 1 and '404' in missing['error']
+    assert len(fixture_server.requests_for('missing.html')) == 1
+    assert found['ok'] and len(calls) == 2
+
+
+def test_requests_to_same_host_are_spaced(talker, fixture_server):
+    urls = [fixture_server.url(f'small.html?{i}') for i in range(3)]
+    results, _ = fetch_all(talker, urls, workers=3, min_interval=0.3)
+    assert all(result['ok'] for result in results)
+    received = sorted(received for _, received in fixture_server.received)
+    assert len(received) == 3
+    assert all(later - earlier >= 0.25 for earlier, later in zip(received, received[1:]))
+
+
+def test_hosts_are_limited_separately(talker, fixture_server):
+    urls = [fixture_server.url('small.html', host='127.0.0.1'), fixture_server.url('small.html', host='localhost')]
+    results, _ = fetch_all(talker, urls, workers=2, min_interval=5)
+    assert all(result['ok'] for result in results)
+    received = sorted(received for _, received in fixture_server.received)
+    # 別のホストへのリクエストは待たない
+    assert received[1] - received[0] < 2
+
+
+def test_cached_pages_are_not_rate_limited(talker, fixture_server):
+    url = fixture_server.url('small.html')
+    fetch_all(talker, [url])
+    fetcher = main.BulkFetcher(talker, min_interval=5)
+    fetcher.limiter.wait('127.0.0.1:%d' % fixture_server.server_address[1])
+    results = fetcher.fetch_all([url])
+    assert results[0]['ok'] and len(fixture_server.requests_for('small.html')) == 1
+
+
+def test_fetch_all_does_not_change_shared_session(talker, fixture_server):
+    session = talker.get_session()
+    adapter = session.get_adapter('http://')
+    fetch_all(talker, [fixture_server.url('small.html')], workers=8)
+    assert talker.get_session() is session and session.get_adapter('http://') is adapter
+    assert adapter._pool_maxsize == talker.pool_size
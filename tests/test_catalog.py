@@ -0,0 +1,67 @@
+import csv
+import os
+import sqlite3
+
+import pytest
+
+import main
+
+WORKS = [
+    ("000001", "000148", "著者", "吾輩は猫である", "わがはいはねこである", "", "夏目", "漱石", "なつめ", "そうせき"),
+    ("000002", "000148", "著者", "坊っちゃん", "ぼっちゃん", "", "夏目", "漱石", "なつめ", "そうせき"),
+    ("000003", "000035", "著者", "走れメロス", "はしれめろす", "", "太宰", "治", "だざい", "おさむ"),
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'list.csv'
+    headers = [header for header, _ in main.AozoraCatalog.COLUMNS]
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for work_id, person_id, role, title, title_yomi, subtitle, last, first, last_yomi, first_yomi in WORKS:
+            row = dict.fromkeys(headers, "")
+            row.update({"作品ID": work_id, "人物ID": person_id, "役割フラグ": role, "作品名": title,
+                        "作品名読み": title_yomi, "副題": subtitle, "姓": last, "名": first,
+                        "姓読み": last_yomi, "名読み": first_yomi,
+                        "XHTML/HTMLファイルURL": f"https://www.aozora.gr.jp/{work_id}.html"})
+            writer.writerow([row[header] for header in headers])
+    return str(path)
+
+
+def test_catalog_is_opened_on_first_use(talker, csv_path):
+    db_path = os.path.join(talker.cache_dir, 'catalog.sqlite3')
+    assert talker.catalog is None and not os.path.exists(db_path)
+    catalog = talker.get_catalog()
+    assert talker.get_catalog() is catalog and os.path.exists(db_path)
+    assert catalog.import_csv(csv_path) == 3
+    assert [work['title'] for work in catalog.search('夏目')] == ['吾輩は猫である', '坊っちゃん']
+
+
+def test_connections_are_closed(tmp_path, csv_path, monkeypatch):
+    connections = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        connections.append(conn)
+        return conn
+
+    monkeypatch.setattr(main.sqlite3, 'connect', tracking_connect)
+    catalog = main.AozoraCatalog(str(tmp_path / 'catalog.sqlite3'))
+    catalog.import_csv(csv_path)
+    catalog.search('メロス')
+    assert connections
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_search_without_fts(tmp_path, csv_path):
+    catalog = main.AozoraCatalog(str(tmp_path / 'catalog.sqlite3'))
+    catalog.import_csv(csv_path)
+    # trigramの使えないSQLiteでも部分一致で検索できる
+    catalog.use_fts = False
+    assert [work['title'] for work in catalog.search('れメロ')] == ['走れメロス']
+    assert [work['title'] for work in catalog.search('猫である')] == ['吾輩は猫である']
@@ -0,0 +1,113 @@
+import random
+import re
+
+import pytest
+
+from make_fixtures import make_text
+
+
+def split_with_baseline(text, chunk_size=200):
+    """
+    iter_chunk_spansに置き換える前の、文字列を組み立てて分割する実装
+    """
+    # 段落ごとに分割
+    paragraphs = text.split('\n\n')
+    chunks = []
+
+    current_chunk = ""
+    for paragraph in paragraphs:
+        # 長い段落は文で分割
+        if len(paragraph) > chunk_size:
+            sentences = re.split(r'(。|、|！|？|,|\.)', paragraph)
+            i = 0
+            while i < len(sentences):
+                if i+1 < len(sentences) and sentences[i+1] in ['。', '、', '！', '？', ',', '.']:
+                    sentence = sentences[i] + sentences[i+1]
+                    i += 2
+                else:
+                    sentence = sentences[i]
+                    i += 1
+
+                if len(current_chunk) + len(sentence) <= chunk_size:
+                    current_chunk += sentence
+                else:
+                    if current_chunk:
+                        chunks.append(current_chunk)
+                    current_chunk = sentence
+        else:
+            if len(current_chunk) + len(paragraph) + 2 <= chunk_size:
+                if current_chunk:
+                    current_chunk += "\n\n" + paragraph
+                else:
+                    current_chunk = paragraph
+            else:
+                chunks.append(current_chunk)
+                current_chunk = paragraph
+
+    if current_chunk:
+        chunks.append(current_chunk)
+
+    return chunks
+
+
+def expected_chunks(text, chunk_size):
+    # 見出しの目次を追加したとき（user-022）から、以前の実装が返していた空のチャンクは返さない
+    return [chunk for chunk in split_with_baseline(text, chunk_size) if chunk]
+
+
+def random_text(rng, length):
+    alphabet = 'あいうえお漢字ab' * 3 + '。、！？,.' + '\n' * 4
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+FIXED_CASES = [
+    ('', 10),
+    ('短い文。', 10),
+    ('あ' * 30, 10),
+    ('一文目。二文目、三文目！四文目？五,六.七', 5),
+    ('段落一\n\n段落二\n\n段落三', 8),
+    ('あ' * 9 + '\n\n' + 'い' * 9, 10),
+    ('\n\n\n\n先頭が空行', 6),
+    ('末尾が空行\n\n\n\n', 6),
+    ('長い段落の前の段落\n\n' + '文です。' * 10, 12),
+    ('。。。、、、', 2),
+]
+
+
+@pytest.mark.parametrize('text, chunk_size', FIXED_CASES)
+def test_fixed_cases_match_baseline(talker, text, chunk_size):
+    assert talker.split_text_into_chunks(text, chunk_size) == expected_chunks(text, chunk_size)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_texts_match_baseline(talker, seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        text = random_text(rng, rng.randint(0, 300))
+        chunk_size = rng.randint(1, 40)
+        assert talker.split_text_into_chunks(text, chunk_size) == expected_chunks(text, chunk_size), (text, chunk_size)
+
+
+def test_generated_work_matches_baseline(talker):
+    text = make_text(200, seed=1)
+    for chunk_size in (50, 200, 1000):
+        assert talker.split_text_into_chunks(text, chunk_size) == expected_chunks(text, chunk_size)
+
+
+def test_spans_reproduce_chunks(talker):
+    rng = random.Random(10)
+    for _ in range(200):
+        text = random_text(rng, rng.randint(0, 300))
+        chunk_size = rng.randint(1, 40)
+        spans = list(talker.iter_chunk_spans(text, chunk_size))
+        assert [talker.chunk_text(text, *span) for span in spans] == expected_chunks(text, chunk_size)
+        # 位置は昇順で重ならない
+        assert all(start < end for start, end, _ in spans)
+        assert all(previous[1] <= current[0] for previous, current in zip(spans, spans[1:]))
+
+
+def test_baseline_empty_chunks_are_dropped(talker):
+    # 段落の長さがチャンクの上限の手前にある場合、以前の実装は空のチャンクを返していた
+    text = 'あ' * 9 + '\n\n' + 'い' * 3
+    assert split_with_baseline(text, 10) == ['', 'あ' * 9, 'い' * 3]
+    assert talker.split_text_into_chunks(text, 10) == ['あ' * 9, 'い' * 3]
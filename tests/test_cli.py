@@ -0,0 +1,46 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    """
+    サブコマンドを実行せず、解析した引数を記録する
+    """
+    received = []
+    for name in ('run_export', 'run_catalog', 'run_fetch', 'run_serve'):
+        monkeypatch.setattr(main, name, lambda args: received.append(args) or 0)
+
+    def run(*argv):
+        monkeypatch.setattr(main.sys, 'argv', ['main.py', *argv])
+        assert main.main() == 0
+        return received[-1]
+    return run
+
+
+def test_unknown_option_of_subcommand_is_an_error(commands, capsys):
+    with pytest.raises(SystemExit) as e:
+        commands('export', 'x.txt', '--chunk-sise', '100', '--metrics', 'm.json')
+    assert e.value.code == 2
+    assert '--chunk-sise' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('argv', [
+    ('--metrics', 'm.json', 'export', 'x.txt', '--chunk-size', '100'),
+    ('export', 'x.txt', '--chunk-size', '100', '--metrics', 'm.json'),
+    ('export', '--metrics', 'm.json', 'x.txt', '--chunk-size', '100'),
+])
+def test_common_options_in_any_position(commands, argv):
+    args = commands(*argv)
+    assert args.command == 'export' and args.sources == ['x.txt']
+    assert args.chunk_size == 100 and args.metrics == 'm.json' and args.startup_timing is False
+
+
+@pytest.mark.parametrize('command', ['catalog', 'fetch', 'serve'])
+def test_common_options_on_each_subcommand(commands, command):
+    assert commands(command).metrics is None
+    args = commands(command, '--metrics', 'm.prom', '--startup-timing')
+    assert args.metrics == 'm.prom' and args.startup_timing is True
+    # サブコマンドの前に書いた値は上書きしない
+    assert commands('--metrics', 'm.json', command).metrics == 'm.json'
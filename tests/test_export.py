@@ -0,0 +1,114 @@
+import json
+import os
+import wave
+
+import pytest
+
+import main
+
+REPEATED_TEXT = "「はい」と言った。\n" * 40
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'novel.txt'
+    path.write_text(REPEATED_TEXT, encoding='utf-8')
+    return str(path)
+
+
+def frames_of(path):
+    with wave.open(path, 'rb') as w:
+        return w.getnframes()
+
+
+def export(talker, source, output_dir, **kwargs):
+    voices = talker.get_voice_list()
+    exporter = main.AudiobookExporter(talker, voices[0], chunk_size=20, workers=4, log=lambda message: None, **kwargs)
+    work_dir = exporter.export(source, output_dir)
+    with open(os.path.join(work_dir, 'index.json'), encoding='utf-8') as f:
+        return work_dir, json.load(f)
+
+
+def test_export_repeated_chunks_with_workers(talker, source, tmp_path):
+    work_dir, info = export(talker, source, str(tmp_path / 'out'))
+    texts = [chunk['text'] for chunk in info['chunks']]
+    assert len(texts) > 4 and len(set(texts)) < len(texts)
+    for chunk in info['chunks']:
+        assert frames_of(os.path.join(work_dir, chunk['file'])) > 0
+    assert not [name for name in os.listdir(work_dir) if '.tmp' in name]
+
+
+def test_export_single_file_with_dialogue_voice(talker, source, tmp_path):
+    dialogue_voice = talker.get_voice_list()[1]
+    work_dir, info = export(talker, source, str(tmp_path / 'out'), dialogue_voice_name=dialogue_voice,
+                            single_file=True)
+    voices = {chunk['voice'] for chunk in info['chunks']}
+    assert dialogue_voice in voices and len(voices) == 2
+    with open(os.path.join(work_dir, 'audiobook.index.json'), encoding='utf-8') as f:
+        index = json.load(f)
+    audiobook_frames = frames_of(os.path.join(work_dir, 'audiobook.wav'))
+    assert audiobook_frames == index['frames'] == index['chunks'][-1]['sample_end']
+    parts = sum(frames_of(os.path.join(work_dir, chunk['file'])) for chunk in info['chunks'])
+    # 読む部分のないチャンク（改行だけ）の前には無音を入れない
+    voiced = [chunk for chunk in index['chunks'] if chunk['sample_end'] > chunk['sample_start']]
+    silence = int(round(talker.chunk_interval * index['sample_rate'])) * (len(voiced) - 1)
+    assert audiobook_frames == parts + silence
+
+
+def test_export_matches_single_worker(talker, source, tmp_path):
+    _, parallel = export(talker, source, str(tmp_path / 'parallel'))
+    exporter = main.AudiobookExporter(talker, talker.get_voice_list()[0], chunk_size=20, workers=1,
+                                      log=lambda message: None)
+    with open(os.path.join(exporter.export(source, str(tmp_path / 'serial')), 'index.json'), encoding='utf-8') as f:
+        serial = json.load(f)
+    assert parallel['chunks'] == serial['chunks']
+
+
+def test_failed_single_file_export_leaves_no_partial_audiobook(talker, source, tmp_path, monkeypatch):
+    work_dir, _ = export(talker, source, str(tmp_path / 'out'), single_file=True)
+    audiobook_path = os.path.join(work_dir, 'audiobook.wav')
+    with open(audiobook_path, 'rb') as f:
+        previous = f.read()
+
+    render_text = talker.render_text
+    calls = []
+
+    def failing_render_text(text, voice_name, wav_path=None):
+        calls.append(text)
+        return None if len(calls) > 5 else render_text(text, voice_name, wav_path)
+
+    monkeypatch.setattr(talker, 'render_text', failing_render_text)
+    with pytest.raises(RuntimeError):
+        export(talker, source, str(tmp_path / 'out'), single_file=True)
+    # 途中まで書いたファイルで前回の書き出しを置き換えない
+    with open(audiobook_path, 'rb') as f:
+        assert f.read() == previous
+    assert not [name for name in os.listdir(work_dir) if '.tmp' in name]
+
+    # 初めての書き出しで失敗した場合はaudiobook.wavを作らない
+    calls.clear()
+    with pytest.raises(RuntimeError):
+        export(talker, source, str(tmp_path / 'first'), single_file=True)
+    work_dir = os.path.join(str(tmp_path / 'first'), os.path.basename(work_dir))
+    assert not [name for name in os.listdir(work_dir) if name.startswith('audiobook')]
+
+
+def test_wav_assembler_replaces_output_only_on_success(tmp_path):
+    part = tmp_path / 'part.wav'
+    with wave.open(str(part), 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(22050)
+        w.writeframes(b'\1\0' * 100)
+    output = str(tmp_path / 'out.wav')
+    with main.WavAssembler(output) as assembler:
+        assembler.append(str(part))
+        assert not os.path.exists(output)
+    assert frames_of(output) == 100
+    with pytest.raises(ValueError):
+        with main.WavAssembler(output) as assembler:
+            assembler.append(str(part))
+            assembler.append(str(part))
+            raise ValueError
+    assert frames_of(output) == 100
+    assert sorted(os.listdir(str(tmp_path))) == ['out.wav', 'part.wav']
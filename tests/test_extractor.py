@@ -0,0 +1,79 @@
+import re
+
+import pytest
+
+import main
+from make_fixtures import fixture_paths, make_html
+
+bs4 = pytest.importorskip('bs4')
+
+
+def extract_with_beautifulsoup(html):
+    """
+    AozoraTextExtractorに置き換える前の、BeautifulSoupによる抽出
+
+    外字の画像を該当する文字に置き換える処理（読みの置き換えと同時に追加した意図的な変更）だけを加えてある。
+    """
+    soup = bs4.BeautifulSoup(html, 'html.parser')
+    title = soup.find('h1', class_='title')
+    author = soup.find('h2', class_='author')
+    title_text = title.text if title else "タイトル不明"
+    author_text = author.text if author else "作者不明"
+    main_text_div = soup.find('div', class_='main_text')
+    if not main_text_div:
+        return None, title_text, author_text
+    for img in main_text_div.find_all('img', class_='gaiji'):
+        img.replace_with(main.TextNormalizer.resolve_gaiji(img.get('alt') or ''))
+    for ruby in main_text_div.find_all('ruby'):
+        ruby_text = ruby.find('rb')
+        if ruby_text:
+            ruby.replace_with(ruby_text.text)
+        else:
+            ruby.replace_with(ruby.text)
+    for rp in main_text_div.find_all('rp'):
+        rp.decompose()
+    for rt in main_text_div.find_all('rt'):
+        rt.decompose()
+    text = main_text_div.get_text()
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text, title_text, author_text
+
+
+def page(body, head='<h1 class="title">題名</h1><h2 class="author">著者</h2>'):
+    return f'<html><head><title>t</title></head><body><div class="metadata">{head}</div>{body}</body></html>'
+
+
+EDGE_CASES = {
+    'ruby_without_rb': page('<div class="main_text">漢字<ruby>東京<rp>（</rp><rt>とうきょう</rt><rp>）</rp></ruby>へ</div>'),
+    'ruby_with_rb': page('<div class="main_text"><ruby><rb>先生</rb><rp>（</rp><rt>せんせい</rt><rp>）</rp></ruby>と</div>'),
+    'entities': page('<div class="main_text">&amp;&lt;&gt;&quot;&#x3042;&#12354;&nbsp;&copy;&unknown;</div>'),
+    'nested_div': page('<div class="main_text">前<div class="jisage_2"><div class="x">中<br />\r\n次</div>後</div>\n\n\n\n末</div>'),
+    'comment_and_script': page('<div class="main_text">a<!-- コメント -->b<script>var x = 1;</script>c</div>'),
+    'whitespace_only': page('<div class="main_text">  \n  <span>  </span>本文\n\n\n\n\n二段落</div>'),
+    'gaiji_and_notes': page('<div class="main_text"><img src="g.png" alt="※" class="gaiji" />'
+                            '<span class="notes">［＃「峠」に傍点］</span><em class="sesame_dot">峠</em></div>'),
+    'no_main_text': page('<div>本文なし</div>'),
+    'no_title': page('<div class="main_text">本文</div>', head=''),
+}
+
+
+@pytest.mark.parametrize('name', sorted(EDGE_CASES))
+def test_edge_cases_match_beautifulsoup(talker, name):
+    html = EDGE_CASES[name]
+    assert talker.extract_aozora_text(html)[:3] == extract_with_beautifulsoup(html)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_generated_pages_match_beautifulsoup(talker, seed):
+    html = make_html(300, seed)
+    assert talker.extract_aozora_text(html)[:3] == extract_with_beautifulsoup(html)
+
+
+def test_fixture_page_matches_beautifulsoup(talker):
+    html_path, _ = fixture_paths('small')
+    with open(html_path, 'rb') as f:
+        content = f.read()
+    html = content.decode(main.AozoraTextExtractor.detect_encoding(content[:1024]))
+    text, title, author = extract_with_beautifulsoup(html)
+    assert talker.extract_aozora_text(html)[:3] == (text, title, author)
+    assert text and title == 'ベンチマーク用作品' and author == 'ベンチマーク太郎'
@@ -0,0 +1,47 @@
+import pytest
+
+import main
+
+pytest.importorskip('requests')
+
+
+def test_bulk_fetch_checks_page_cache(talker, fixture_server):
+    urls = [fixture_server.url('small.html')]
+    fetcher = main.BulkFetcher(talker, workers=1, min_interval=0)
+    first = fetcher.fetch_all(urls)
+    assert first[0]['ok'], first[0]['error']
+    assert talker.is_cached(urls[0])
+    # キャッシュ済みの作品はサーバーに問い合わせない
+    second = fetcher.fetch_all(urls)
+    assert second[0]['ok'] and second[0]['title'] == first[0]['title']
+    assert len(fixture_server.requests_for('small.html')) == 1
+
+
+def wait_for_fetch(app, window):
+    assert window.fetch_worker.wait(30000)
+    app.processEvents()
+
+
+def test_streaming_fetch_in_gui(talker, fixture_server, monkeypatch):
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    monkeypatch.setattr(main, 'AozoraSeikaTalker', lambda: talker)
+    window = main.AozoraReaderGUI()
+    url = fixture_server.url('small.html')
+
+    window.url_input.setText(url)
+    window.streaming.setChecked(True)
+    window.fetch_text()
+    # 取得しながら読む場合は、届いた分から分割する
+    assert window.fetch_worker.stream is not None
+    wait_for_fetch(app, window)
+    expected, title, _, _ = talker.get_aozora_text(url)
+    assert expected and window.document.text == talker.normalize_text(expected)[0]
+    assert window.text_stream is None and window.fetch_button.isEnabled()
+
+    # キャッシュ済みなら一度に取得する
+    window.fetch_text()
+    assert window.fetch_worker.stream is None
+    wait_for_fetch(app, window)
+    assert window.document.text == talker.normalize_text(expected)[0] and window.title_label.text() == f"タイトル: {title}"
+    window.close()
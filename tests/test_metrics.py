@@ -0,0 +1,54 @@
+import json
+import os
+import stat
+import threading
+
+import pytest
+
+import main
+
+
+def test_concurrent_writes_to_same_file(tmp_path):
+    # GUIの定期書き出しと手動の保存が重なっても、どちらかの完全な内容になる
+    metrics = main.Metrics(enabled=True)
+    metrics.count('page_cache_hits', 3)
+    path = str(tmp_path / 'metrics.json')
+    errors = []
+
+    def write():
+        try:
+            for _ in range(50):
+                metrics.write(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['counters'] == {'page_cache_hits': 3}
+    assert os.listdir(str(tmp_path)) == ['metrics.json']
+    assert stat.S_IMODE(os.stat(path).st_mode) & 0o044 == 0o044
+
+
+def test_failed_write_keeps_previous_file(tmp_path, monkeypatch):
+    metrics = main.Metrics(enabled=True)
+    path = str(tmp_path / 'metrics.prom')
+    metrics.write(path)
+    with open(path, encoding='utf-8') as f:
+        previous = f.read()
+
+    def failing_replace(*args):
+        raise OSError("read-only")
+
+    monkeypatch.setattr(main.os, 'replace', failing_replace)
+    metrics.count('fetch_bytes', 100)
+    with pytest.raises(OSError):
+        metrics.write(path)
+    monkeypatch.undo()
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == previous
+    assert os.listdir(str(tmp_path)) == ['metrics.prom']
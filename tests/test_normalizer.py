@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+import main
+
+ENTRIES = {"東京": "とうきょう", "東京都": "とうきょうと", "京都": "きょうと", "京都府": "きょうとふ",
+           "都": "みやこ", "青空": "あおぞら", "青空文庫": "あおぞらぶんこ", "(株)": "かぶしきがいしゃ", "a.b": "エービー"}
+
+
+def normalize_with_baseline(entries, text):
+    """
+    各位置で辞書の語を長い順に試す、素朴な最長一致の置き換え
+    """
+    words = sorted(entries, key=len, reverse=True)
+    result = []
+    i = 0
+    while i < len(text):
+        word = next((word for word in words if text.startswith(word, i)), None)
+        if word:
+            result.append(entries[word])
+            i += len(word)
+        else:
+            result.append(text[i])
+            i += 1
+    return ''.join(result)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("東京都の京都府", "とうきょうとのきょうとふ"),
+    # 「東京都」が「京都」より先に一致する
+    ("東京都府", "とうきょうと府"),
+    ("東京と京都と都", "とうきょうときょうととみやこ"),
+    ("青空文庫の青空", "あおぞらぶんこのあおぞら"),
+    # 正規表現の記号を含む語もそのまま比べる
+    ("(株)青空とa.bとaxb", "かぶしきがいしゃあおぞらとエービーとaxb"),
+    ("辞書にない文", "辞書にない文"),
+    ("", ""),
+])
+def test_longest_match(text, expected):
+    assert main.TextNormalizer(ENTRIES).normalize(text) == expected
+
+
+def test_matches_baseline_on_random_text():
+    entries = {"ab": "1", "abc": "2", "bcd": "3", "c": "4", "cda": "5", "d": "", "bb": "6"}
+    normalizer = main.TextNormalizer(entries)
+    rng = random.Random(0)
+    for _ in range(500):
+        text = ''.join(rng.choice("abcdx") for _ in range(rng.randrange(30)))
+        assert normalizer.normalize(text) == normalize_with_baseline(entries, text)
+
+
+def test_update_and_clear():
+    normalizer = main.TextNormalizer({"東京": "とうきょう"})
+    assert normalizer.normalize("東京都") == "とうきょう都"
+    normalizer.update({"東京都": "とうきょうと", "": "空"})
+    assert normalizer.normalize("東京都") == "とうきょうと"
+    normalizer.update({"東京都": "トウキョウト"})
+    assert normalizer.normalize("東京都") == "トウキョウト"
+    normalizer.clear()
+    assert normalizer.normalize("東京都") == "東京都"
+
+
+def test_load_dictionary_file(tmp_path):
+    path = tmp_path / 'dictionary.txt'
+    path.write_text("\ufeff# 注釈\n東京\tとうきょう\n\n京都,きょうと\n読みなし\n", encoding='utf-8')
+    normalizer = main.TextNormalizer({"青空": "あおぞら"})
+    assert normalizer.load(str(path)) == 2
+    assert normalizer.normalize("東京と京都と青空") == "とうきょうときょうとと青空"
+
+
+def test_normalize_with_offsets():
+    normalizer = main.TextNormalizer(ENTRIES)
+    text = "第一章　東京都の京都\n第二章"
+    offsets = [0, 4, 5, 6, 7, 8, 9, 10, 11, len(text)]
+    normalized, result = normalizer.normalize_with_offsets(text, offsets)
+    assert normalized == normalizer.normalize(text) == "第一章　とうきょうとのきょうと\n第二章"
+    # 置き換えた語の途中は語の先頭に寄せ、それ以外はずらすだけ
+    assert result == [0, 4, 4, 4, 10, 11, 11, 15, 16, len(normalized)]
+    for offset, moved in zip(offsets, result):
+        if offset in (0, 7, 10, 11):
+            assert normalized[moved] == text[offset]
+
+
+def test_normalize_with_offsets_without_entries():
+    text = "東京都の京都"
+    assert main.TextNormalizer().normalize_with_offsets(text, [1, 3]) == (text, [1, 3])
+    assert main.TextNormalizer(ENTRIES).normalize_with_offsets(text, []) == ("とうきょうとのきょうと", [])
+
+
+def test_normalize_with_offsets_matches_normalize_on_random_text():
+    entries = {"ab": "1", "abc": "22", "bcd": "333", "c": "", "x": "xx"}
+    normalizer = main.TextNormalizer(entries)
+    rng = random.Random(1)
+    for _ in range(200):
+        text = ''.join(rng.choice("abcdx") for _ in range(rng.randrange(1, 30)))
+        offsets = sorted(rng.sample(range(len(text) + 1), min(5, len(text) + 1)))
+        normalized, result = normalizer.normalize_with_offsets(text, offsets)
+        assert normalized == normalizer.normalize(text)
+        # 直した位置は、その位置の前までを置き換えた結果の中（語の途中ならその語の先頭）を指す
+        for offset, moved in zip(offsets, result):
+            assert moved <= len(normalizer.normalize(text[:offset]))
+            assert normalized.startswith(normalizer.normalize(text[:offset])[:moved])
+        assert result == sorted(result)
+
+
+@pytest.mark.parametrize('note, expected', [
+    ("※［＃「てへん＋劣」、第3水準1-84-77］", "挘"),
+    ("※［＃「木＋吶のつくり」、第3水準1-85-54］", "枘"),
+    ("※［＃「口＋世」、第4水準2-4-6］", "㖨"),
+    ("※［＃「つちへん＋怜のつくり」、第4水準2-94-86］", "\U0002a6b2"),
+    # XHTMLの外字画像のalt
+    ("※(「てへん＋劣」、第3水準1-84-77)", "挘"),
+    ("※［＃「魚＋師のつくり」、U+9C24、125-7］", "鰤"),
+    ("※［＃「絵文字」、U+1F600］", "\U0001f600"),
+    # 書かれていないか、文字に直せない注記は読み飛ばす
+    ("※［＃「不明な字」］", ""),
+    ("※［＃「不明な字」、第4水準2-2-1］", ""),
+    ("※［＃「不明な字」、1-95-1］", ""),
+    ("※［＃「不明な字」、1-84-77-1］", ""),
+    ("※［＃「不明な字」、U+D800］", ""),
+    ("※［＃「不明な字」、U+110000］", ""),
+])
+def test_resolve_gaiji(note, expected):
+    assert main.TextNormalizer.resolve_gaiji(note) == expected
+
+
+def test_replace_gaiji():
+    text = "※［＃「てへん＋劣」、第3水準1-84-77］いで※［＃「不明な字」］※［＃「魚＋師のつくり」、U+9C24、125-7］を食べる［＃「食べる」に傍点］"
+    # 外字の注記だけを置き換え、それ以外の注記は残す
+    assert main.TextNormalizer.replace_gaiji(text) == "挘いで鰤を食べる［＃「食べる」に傍点］"
+    assert main.TextNormalizer.replace_gaiji("外字なし") == "外字なし"
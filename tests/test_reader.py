@@ -0,0 +1,73 @@
+import pytest
+
+import main
+
+
+def make_worker(talker, chunks=3):
+    document = main.Document("本文です。\n\n" * chunks, "t", "a", [])
+    _, document = talker.chunk_document(document, 5)
+    talker.set_interval(0)
+    return main.ReaderWorker(talker, document, talker.get_voice_list()[0])
+
+
+@pytest.mark.parametrize('lookahead', [0, 2])
+def test_stop_before_thread_starts(talker, lookahead):
+    talker.set_lookahead(lookahead)
+    worker = make_worker(talker)
+    read = []
+    worker.current_chunk_changed.connect(read.append)
+    talker.begin_reading()
+    # スレッドが動き出す前に押された停止も効く
+    talker.stop()
+    worker.start()
+    assert worker.wait(10000)
+    assert read == [] and worker.current_chunk == 0
+
+
+@pytest.mark.parametrize('lookahead', [0, 2])
+def test_reads_all_chunks(talker, lookahead):
+    talker.set_lookahead(lookahead)
+    worker = make_worker(talker)
+    talker.begin_reading()
+    worker.start()
+    assert worker.wait(10000)
+    assert worker.current_chunk == len(worker.chunks) == 3
+    assert not talker.is_reading
+
+
+FIRST_CHUNK = "私はその人を常に先生と呼んでいた。だからここでもただ先生と書くだけで本名は打ち明けない。" * 3
+
+
+@pytest.mark.parametrize('seconds_per_char, size', [(None, 40), (0.5 / 12, 10), (0.5 / 25, 20), (0.5 / 39, 20),
+                                                    (0.5 / 41, 40), (0.5 / 500, 160), (1.0, 10)])
+def test_first_chunk_size_is_rounded_to_steps(talker, seconds_per_char, size):
+    talker.synthesis_seconds_per_char = seconds_per_char
+    assert talker.get_first_chunk_size() == size
+
+
+def test_first_chunk_split_is_stable_across_sessions(talker):
+    talker.set_adaptive_chunking(True)
+    voice = talker.get_voice_list()[0]
+    # 前のセッションの計測した速度で分けて合成しておく
+    talker.synthesis_seconds_per_char = 0.5 / 25
+    previous = talker.split_first_chunk(FIRST_CHUNK, voice)
+    assert len(previous) > 1
+    for piece in previous:
+        assert talker.render_text(piece, voice)
+    # 計測した速度が変わっても、キャッシュ済みの分け方を使う
+    for seconds_per_char in (0.5 / 30, 0.5 / 90, None):
+        talker.synthesis_seconds_per_char = seconds_per_char
+        assert talker.split_first_chunk(FIRST_CHUNK, voice) == previous
+    # 話者を指定しなければ計測した速度で分ける
+    talker.synthesis_seconds_per_char = 0.5 / 90
+    assert talker.split_first_chunk(FIRST_CHUNK) != previous
+
+
+def test_cached_first_chunk_is_not_split(talker):
+    talker.set_adaptive_chunking(True)
+    voice = talker.get_voice_list()[0]
+    assert len(talker.split_first_chunk(FIRST_CHUNK, voice)) > 1
+    hits, misses = talker.audio_cache.hits, talker.audio_cache.misses
+    assert talker.render_text(FIRST_CHUNK, voice)
+    assert talker.split_first_chunk(FIRST_CHUNK, voice) == [FIRST_CHUNK]
+    assert (talker.audio_cache.hits, talker.audio_cache.misses) == (hits, misses + 1)
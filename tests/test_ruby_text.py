@@ -0,0 +1,125 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+import main
+from make_fixtures import fixture_paths
+
+SAMPLE = """吾輩は猫である
+夏目漱石
+
+-------------------------------------------------------
+【テキスト中に現れる記号について】
+
+《》：ルビ
+（例）吾輩《わがはい》
+
+｜：ルビの付く文字列の始まりを特定する記号
+（例）一｜疋《ぴき》
+
+［＃］：入力者注　主に外字の説明や、傍点の位置の指定
+-------------------------------------------------------
+
+［＃８字下げ］一［＃「一」は大見出し］
+
+　吾輩《わがはい》は猫である。名前はまだ無い。
+　どこで生れたか一｜疋《ぴき》の※［＃「てへん＋劣」、第3水準1-84-77］とんと見当《けんとう》がつかぬ。［＃「つかぬ」に傍点］
+
+
+
+［＃５字下げ］［＃中見出し］二［＃中見出し終わり］
+
+　書生《しょせい》という人間中で一番｜獰悪《どうあく》な種族であったそうだ。
+
+
+底本：「吾輩は猫である」岩波文庫
+入力：青空文庫
+"""
+
+EXPECTED_TEXT = ("一\n\n"
+                 "　吾輩は猫である。名前はまだ無い。\n"
+                 "　どこで生れたか一疋の挘とんと見当がつかぬ。\n\n"
+                 "二\n\n"
+                 "　書生という人間中で一番獰悪な種族であったそうだ。")
+
+
+def encode(text, encoding='cp932'):
+    return text.replace('\n', '\r\n').encode(encoding)
+
+
+def assert_sample(result):
+    text, title, author, headings = result
+    assert text == EXPECTED_TEXT
+    assert (title, author) == ("吾輩は猫である", "夏目漱石")
+    assert [(heading.level, heading.title) for heading in headings] == [(1, "一"), (2, "二")]
+    # 見出しの位置は本文中の見出しの行の先頭
+    assert [heading.offset for heading in headings] == [0, EXPECTED_TEXT.index("二")]
+
+
+def test_parse_ruby_notes_headings_and_footer():
+    assert_sample(main.AozoraRubyTextParser().parse(io.BytesIO(encode(SAMPLE))))
+
+
+def test_read_shift_jis_file(talker, tmp_path):
+    path = tmp_path / 'wagahai.txt'
+    path.write_bytes(encode(SAMPLE))
+    assert_sample(talker.read_text_file(str(path)))
+
+
+def test_read_zip_file(talker, tmp_path):
+    path = tmp_path / 'wagahai.zip'
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('readme.html', b'<html></html>')
+        archive.writestr('wagahai_ruby.txt', encode(SAMPLE))
+    assert_sample(talker.read_text_file(str(path)))
+
+
+def test_read_utf8_files(talker, tmp_path):
+    # 記号の説明があれば青空文庫形式、なければそのままの文章として読む
+    aozora = tmp_path / 'aozora.txt'
+    aozora.write_bytes(encode(SAMPLE, 'utf-8'))
+    assert_sample(talker.read_text_file(str(aozora)))
+    plain = tmp_path / 'memo.txt'
+    plain.write_text("そのままの《文章》。\n底本：なし\n", encoding='utf-8')
+    assert talker.read_text_file(str(plain)) == ("そのままの《文章》。\n底本：なし\n", "memo", "ローカルファイル", [])
+
+
+def test_body_without_notes_block():
+    text, title, author, headings = main.AozoraRubyTextParser().parse(io.BytesIO(encode(
+        "題名\n副題\n作者\n\n\n　本文《ほんぶん》です。\n\n底本：なし\n")))
+    assert (text, title, author, headings) == ("　本文です。", "題名 副題", "作者", [])
+
+
+@pytest.mark.parametrize('block_size', [1, 2, 3, 5, 7, 64])
+def test_characters_split_across_blocks(block_size):
+    data = encode(SAMPLE)
+    lines = list(main.AozoraRubyTextParser.iter_decoded_lines(io.BytesIO(data), block_size=block_size))
+    assert lines == data.decode('cp932').split('\r\n')[:-1]
+
+
+def test_character_split_at_read_block_boundary(talker, tmp_path):
+    head = encode(SAMPLE.split('［＃８字下げ］')[0])
+    # 読み込みの単位（64KB）の境目が2バイト文字の途中になるようにする
+    padding = b'' if (64 * 1024 - len(head)) % 2 else b'x'
+    count = 40000
+    path = tmp_path / 'long.txt'
+    path.write_bytes(head + padding + encode("猫" * count + "\n\n底本：なし\n"))
+    text, _, _, _ = talker.read_text_file(str(path))
+    assert '\ufffd' not in text
+    assert text == padding.decode() + "猫" * count
+
+
+def test_small_fixture(talker):
+    _, txt_path = fixture_paths('small')
+    text, title, author, headings = talker.read_text_file(txt_path)
+    assert (title, author) == ("ベンチマーク用作品", "ベンチマーク太郎")
+    for markup in ('《', '》', '｜', '［＃', '※', '底本：', '\r'):
+        assert markup not in text
+    assert '挘' in text and '\n\n\n' not in text
+    assert headings[0] == main.Heading(1, "第1章", 0) and headings[1] == main.Heading(2, "1", 5)
+    for heading in headings:
+        assert text[heading.offset:].startswith(heading.title)
+    assert [heading.offset for heading in headings] == sorted(heading.offset for heading in headings)
+    assert os.path.getsize(txt_path) > len(text)
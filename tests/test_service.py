@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def service(talker, tmp_path):
+    service = main.ReadingService(talker, workers=2, output_dir=str(tmp_path / 'output'))
+    service.start()
+    yield service
+    service.shutdown()
+
+
+def post_job(service, request):
+    return service.handle_request('POST', '/jobs', {}, json.dumps(request).encode('utf-8'))
+
+
+def run_job(service, request):
+    status, payload = post_job(service, request)
+    assert status == 202, payload
+    job = service.get(payload['id'])
+    assert service.wait(job, 30)
+    return job
+
+
+@pytest.mark.parametrize('priority', ["high", True, 1.5, [1], {"a": 1}])
+def test_invalid_priority_is_rejected_before_queueing(service, priority):
+    status, payload = post_job(service, {"kind": "chunk", "params": {"text": "本文。"}, "priority": priority})
+    assert status == 400 and 'priority' in payload['error']
+    assert service.jobs == {} and service.active == {} and service.queue == []
+    # 処理スレッドは止まらず、続く依頼を実行できる
+    job = run_job(service, {"kind": "chunk", "params": {"text": "本文。"}, "priority": -1})
+    assert job.status == 'done' and job.result['spans'] == [(0, 3, -1)]
+    assert all(thread.is_alive() for thread in service.threads)
+
+
+def test_same_job_is_shared_and_promoted(talker, tmp_path):
+    service = main.ReadingService(talker, workers=1, output_dir=str(tmp_path / 'output'))
+    first = service.submit('chunk', {"text": "一。"})
+    second = service.submit('chunk', {"text": "二。"}, priority=5)
+    shared = service.submit('chunk', {"text": "二。"}, priority=0)
+    assert shared is second and second.clients == 2 and second.priority == 0
+    service.start()
+    try:
+        assert service.wait(first, 30) and service.wait(second, 30)
+        # 繰り上げた処理（0）が既定の優先度（1）の処理より先に始まる
+        assert second.started <= first.started
+    finally:
+        service.shutdown()
+
+
+def test_broken_queue_does_not_stop_workers(talker, tmp_path):
+    service = main.ReadingService(talker, workers=1, output_dir=str(tmp_path / 'output'))
+    broken = service.submit('chunk', {"text": "一。"})
+    other = service.submit('chunk', {"text": "二。"})
+    # 比べられない優先度が紛れ込んだ場合
+    broken.priority = "high"
+    service.queue.append(("high", 999, broken))
+    service.start()
+    try:
+        assert service.wait(broken, 30) and service.wait(other, 30)
+        assert all(thread.is_alive() for thread in service.threads)
+        job = service.submit('chunk', {"text": "三。"})
+        assert service.wait(job, 30) and job.status == 'done'
+    finally:
+        service.shutdown()
+
+
+def headers_for(service, **overrides):
+    headers = {"Host": "127.0.0.1:8765", "Authorization": f"Bearer {service.token}",
+               "Content-Type": "application/json"}
+    headers.update(overrides)
+    return {name: value for name, value in headers.items() if value is not None}
+
+
+@pytest.mark.parametrize('overrides, status', [
+    ({}, None),
+    ({"Host": "localhost"}, None),
+    ({"Host": "[::1]:8765", "Origin": "http://localhost:3000"}, None),
+    ({"Host": "evil.example:8765"}, 403),
+    ({"Host": None}, 403),
+    ({"Origin": "http://evil.example"}, 403),
+    ({"Authorization": None}, 401),
+    ({"Authorization": "Bearer wrong"}, 401),
+    ({"Content-Type": "text/plain"}, 415),
+    ({"Content-Type": "application/x-www-form-urlencoded"}, 415),
+    ({"Content-Type": "application/json; charset=utf-8"}, None),
+])
+def test_authorize(service, overrides, status):
+    rejected = service.authorize('POST', headers_for(service, **overrides))
+    assert (rejected[0] if rejected else None) == status
+
+
+def test_token_is_kept_in_cache_dir(talker, tmp_path):
+    assert main.ReadingService.load_token(talker.cache_dir) is None
+    token = main.ReadingService(talker, workers=1).token
+    assert len(token) >= 32 and main.ReadingService.load_token(talker.cache_dir) == token
+    assert main.ReadingService(talker, workers=1).token == token
+    assert main.ReadingService.load_token(str(tmp_path / 'other')) is None
+
+
+def test_paths_are_limited_to_configured_dirs(talker, tmp_path):
+    allowed = tmp_path / 'books'
+    allowed.mkdir()
+    (allowed / 'novel.txt').write_text("本文です。", encoding='utf-8')
+    (tmp_path / 'secret.txt').write_text("秘密", encoding='utf-8')
+    (allowed / 'link.txt').symlink_to(tmp_path / 'secret.txt')
+    output = tmp_path / 'output'
+    service = main.ReadingService(talker, workers=1, output_dir=str(output), read_dirs=[str(allowed)])
+
+    job = service.submit('chunk', {"path": str(allowed / 'novel.txt')})
+    assert job.params['path'] == str(allowed / 'novel.txt')
+    for params in ({"path": str(tmp_path / 'secret.txt')}, {"path": str(allowed / '..' / 'secret.txt')},
+                   {"path": str(allowed / 'link.txt')}, {"path": 1}):
+        with pytest.raises(ValueError):
+            service.submit('extract', params)
+    with pytest.raises(ValueError):
+        service.submit('export', {"source": str(tmp_path / 'secret.txt')})
+    with pytest.raises(ValueError):
+        service.submit('export', {"source": str(allowed / 'novel.txt'), "output": str(tmp_path / 'elsewhere')})
+    service.submit('export', {"source": str(allowed / 'novel.txt'), "output": str(output / 'sub')})
+    service.submit('export', {"source": "https://www.aozora.gr.jp/cards/000001/files/1.html"})
+    # 読み込みを許可したディレクトリがなければ、ローカルのファイルは読まない
+    with pytest.raises(ValueError):
+        main.ReadingService(talker, workers=1).submit('chunk', {"path": str(allowed / 'novel.txt')})
+
+
+def test_http_api_requires_token(talker, tmp_path):
+    requests = pytest.importorskip('requests')
+    service = main.ReadingService(talker, workers=1, output_dir=str(tmp_path / 'output'))
+    thread = threading.Thread(target=service.serve, args=("127.0.0.1", 0), daemon=True)
+    thread.start()
+    while getattr(service, 'server', None) is None:
+        time.sleep(0.01)
+    url = f"http://127.0.0.1:{service.server.server_address[1]}"
+    try:
+        client = main.ReadingServiceClient(url, cache_dir=talker.cache_dir)
+        assert client.run('chunk', {"text": "本文。"})['spans'] == [[0, 3, -1]]
+        assert requests.get(url + "/status").status_code == 401
+        form = requests.post(url + "/jobs", data="kind=chunk", headers={"Authorization": f"Bearer {service.token}"})
+        assert form.status_code == 415
+        rebound = requests.get(url + "/status", headers={"Host": "attacker.example",
+                                                         "Authorization": f"Bearer {service.token}"})
+        assert rebound.status_code == 403
+        with pytest.raises(RuntimeError):
+            main.ReadingServiceClient(url, token="wrong").status()
+    finally:
+        service.server.shutdown()
+        thread.join(10)
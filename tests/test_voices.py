@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+
+import main
+
+
+def test_voice_list_is_saved(talker):
+    voices = talker.get_voice_list()
+    path = os.path.join(talker.cache_dir, 'voices.json')
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    assert len(data['voices']) == len(voices)
+    assert not [name for name in os.listdir(talker.cache_dir) if '.tmp' in name]
+
+
+def test_concurrent_saves_from_several_processes(talker, monkeypatch):
+    talker.get_voice_list()
+    path = os.path.join(talker.cache_dir, 'voices.json')
+    # 同じファイルを使う2つのインスタンス（画面とサービス）から同時に保存する
+    registries = [main.VoiceRegistry(path) for _ in range(2)]
+    for registry in registries:
+        registry.get_voices(talker.backend)
+    replace = os.replace
+    failures = []
+
+    def tracking_replace(src, dst):
+        try:
+            replace(src, dst)
+        except OSError as e:
+            failures.append(e)
+            raise
+
+    monkeypatch.setattr(main.os, 'replace', tracking_replace)
+    threads = [threading.Thread(target=lambda registry=registry: [registry.save() for _ in range(50)])
+               for registry in registries * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    monkeypatch.undo()
+    assert failures == []
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['voices']
+    assert not [name for name in os.listdir(talker.cache_dir) if '.tmp' in name]
+
+
+def test_failed_save_leaves_no_temp_file(talker, monkeypatch):
+    talker.get_voice_list()
+    path = os.path.join(talker.cache_dir, 'voices.json')
+    with open(path, 'rb') as f:
+        previous = f.read()
+
+    def failing_replace(*args):
+        raise OSError("read-only")
+
+    registry = main.VoiceRegistry(path)
+    registry.get_voices(talker.backend)
+    monkeypatch.setattr(main.os, 'replace', failing_replace)
+    registry.save()
+    monkeypatch.undo()
+    with open(path, 'rb') as f:
+        assert f.read() == previous
+    assert not [name for name in os.listdir(talker.cache_dir) if '.tmp' in name]
+
+
+def test_list_voices_does_not_print(talker, capsys):
+    # export・fetchの出力（標準出力）に話者一覧の生の行を混ぜない
+    assert talker.backend.list_voices()
+    assert capsys.readouterr().out == ""